@@ -1,21 +1,45 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 import os
-from sqlalchemy import JSON
+import hashlib
+import json
+from functools import wraps
+from sqlalchemy import JSON, bindparam
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.attributes import flag_modified
 from dotenv import load_dotenv
-from datetime import datetime, timezone
-
-from backend.utils import time_to_minutes, minutes_to_time
-from backend.scheduler import Scheduler
+from datetime import datetime, timezone, date
+
+from backend.utils import time_to_minutes
+from backend.optimizer import ScheduleOptimizer
+from backend.fairness import schedule_contribution
+from backend.feasibility import FeasibilityCheck
+from backend.preview import StationCache, FragmentCache, schedule_table
+from backend.archive import ScheduleArchive
+from backend.scenarios import ScenarioRunner, perturbation_error
 from backend.xlsx_writer import XLSXWriter
 
 from debug.report import Report
 from debug.logger import Logger
+from debug.schedule_diff import snapshot
 
 LOG_PATH = "debug/log.txt"
 
+BUG_REPORTS_PER_PAGE = 25
+
+#seconds the optional optimize pass may spend improving on the greedy schedule
+OPTIMIZE_TIME_BUDGET = 2.0
+#search processes per optimize request, each gunicorn worker starts its own pool
+OPTIMIZE_WORKERS = int(os.environ.get("OPTIMIZE_WORKERS", 2))
+
+STATION_CACHE = StationCache()
+#today's schedule table per account, shared by every dashboard refresh until the schedule or preferences change
+DASHBOARD_CACHE = FragmentCache()
+
+#last schedule handed out per account with the priority and optimize flag that built it, compared against on bug reports
+LAST_SCHEDULES = {}
+
 ROTATION_CYCLE = {"data":[
     "Kiddie", "Dive", "Main", "Break", "First Aid", "Slide",
     "Main2", "Rover", "Lap", "See Manager", "Bathroom Break"
@@ -54,7 +78,10 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:/
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['PROCESSED_FOLDER'] = 'processed'
+app.config['ARCHIVE_FOLDER'] = os.environ.get('ARCHIVE_FOLDER', 'archive')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+#comma separated, nobody is an admin unless this is set
+app.config['ADMIN_EMAILS'] = [e.strip() for e in os.environ.get('ADMIN_EMAILS', '').split(',') if e.strip()]
 
 
 db = SQLAlchemy(app)
@@ -62,6 +89,8 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+SCHEDULE_ARCHIVE = ScheduleArchive(app.config['ARCHIVE_FOLDER'])
+
 
 # Models
 class User(UserMixin, db.Model):
@@ -87,16 +116,258 @@ class Preferences(db.Model):
 
 class BugReport(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    report_user_id = db.Column(db.Integer)
-    time_stamp = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    report_user_id = db.Column(db.Integer, index=True)
+    time_stamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     bug_description = db.Column(db.String)
-    resolved = db.Column(db.Boolean, default=False)
+    resolved = db.Column(db.Boolean, default=False, index=True)
+
+
+class FinalizedSchedule(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    account = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    contribution = db.Column(JSON)
+
+    __table_args__ = (db.UniqueConstraint("account", "day"),)
+
+class GuardStats(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    account = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    guard = db.Column(db.String, nullable=False)
+    minutes = db.Column(db.Integer, default=0)
+    demand_minutes = db.Column(db.Float, default=0)
+
+    __table_args__ = (db.UniqueConstraint("account", "guard"),)
+
+class GuardStationStats(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    account = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    guard = db.Column(db.String, nullable=False)
+    station = db.Column(db.String, nullable=False)
+    minutes = db.Column(db.Integer, default=0)
+
+    __table_args__ = (db.UniqueConstraint("account", "guard", "station"),)
+
+
+def preferences_state(preferences):
+    return {col.name: getattr(preferences, col.name) for col in Preferences.__table__.columns}
+
+def preferences_version(preferences):
+    #content hash of everything the scheduler reads, changes whenever the preferences do
+    state = json.dumps(preferences_state(preferences), sort_keys=True, default=str)
+    return hashlib.sha1(state.encode("utf-8")).hexdigest()[:16]
+
+def dashboard_version(preferences):
+    #guard priority moves with every finalized day, so the same preferences give a different schedule tomorrow
+    return f"{date.today().isoformat()}-{preferences_version(preferences)}"
+
+def render_schedule_fragment(scheduler):
+    return render_template("schedule_preview.html", table=schedule_table(scheduler))
+
+def schedule_fragment(preferences, shifts=None):
+    #rendered table, or the fragment's error state when the shifts can't be scheduled
+    result = feasibility_check(preferences, shifts).run()
+    if not result["lunch"]["window_ok"]:
+        return render_template("schedule_preview.html", error="The acceptable lunch window must be longer than an hour")
+    if result["uncovered"]:
+        window = result["uncovered"][0]
+        return render_template("schedule_preview.html", error=f"Nobody is on duty {window['start']} - {window['end']}")
+    try:
+        scheduler = build_schedule(preferences, shifts=shifts)
+    except Exception as e:
+        #gaps in coverage are normal while shifts are being edited, not worth a traceback
+        app.logger.warning("Failed building schedule preview: %r", e)
+        return render_template("schedule_preview.html", error="No schedule can be built from these shifts, check that every time has a guard on duty")
+    return render_schedule_fragment(scheduler)
+
+def todays_schedule_html(preferences):
+    #only rebuilt when the preferences change or a schedule is generated, refreshes reuse the cached fragment
+    if preferences is None or not preferences.shifts:
+        return render_template("schedule_preview.html", error="Configure shifts to see today's schedule")
+
+    version = dashboard_version(preferences)
+    html = DASHBOARD_CACHE.get(current_user.id, version)
+    if html is None:
+        html = schedule_fragment(preferences)
+        DASHBOARD_CACHE.put(current_user.id, version, html)
+    return html
+
+def cached_schedule_page(template):
+    preferences = Preferences.query.filter_by(account=current_user.id).first()
+    schedule_html = todays_schedule_html(preferences)
+    response = app.make_response(render_template(template, schedule_html=schedule_html))
+    response.add_etag()
+    return response.make_conditional(request)
+
+def feasibility_check(preferences, shifts=None):
+    state = preferences_state(preferences)
+    if shifts is not None:
+        state["shifts"] = shifts
+    return FeasibilityCheck(STATION_CACHE.scheduler(state))
+
+def guard_priority(account):
+    #running demand share per guard, leaving out today's finalized schedule so regenerating today
+    #sees the same totals the first generation did and the same inputs give the same schedule
+    totals = {s.guard: [s.minutes, s.demand_minutes] for s in GuardStats.query.filter_by(account=account)}
+    finalized = FinalizedSchedule.query.filter_by(account=account, day=date.today()).first()
+    if finalized is not None and finalized.contribution:
+        for guard, stations in finalized.contribution["stations"].items():
+            if guard in totals:
+                totals[guard][0] -= sum(stations.values())
+                totals[guard][1] -= finalized.contribution["demand"][guard]
+    #rounded so float drift from adding and removing contributions can't reorder equal guards
+    return {guard: round(demand / minutes, 6) for guard, (minutes, demand) in totals.items() if minutes > 0}
+
+def build_schedule(preferences, optimize=False, shifts=None, priority=None):
+    state = preferences_state(preferences)
+    if shifts is not None:
+        state["shifts"] = shifts
+    scheduler = STATION_CACHE.scheduler(state)
+    scheduler.guard_priority = guard_priority(preferences.account) if priority is None else priority
+    scheduler.schedule_lunches()
+    if optimize:
+        #the optimizer works on its own copy, on failure the greedy schedule is still there to fall back on
+        try:
+            return ScheduleOptimizer(scheduler, time_budget=OPTIMIZE_TIME_BUDGET, workers=OPTIMIZE_WORKERS).optimize()
+        except Exception:
+            app.logger.exception("Optimize failed, falling back to the greedy schedule")
+    scheduler.create_base_schedule()
+    return scheduler
+
+def apply_contribution(account, contribution, sign):
+    #missing rows are created at zero, then every counter moves with one atomic "minutes = minutes + delta"
+    guards = list(contribution["stations"])
+    if not guards:
+        return
+    known_guards = {guard for guard, in db.session.query(GuardStats.guard).filter(
+        GuardStats.account == account, GuardStats.guard.in_(guards))}
+    known_stations = set(db.session.query(GuardStationStats.guard, GuardStationStats.station).filter(
+        GuardStationStats.account == account, GuardStationStats.guard.in_(guards)))
+
+    db.session.add_all(
+        GuardStats(account=account, guard=guard, minutes=0, demand_minutes=0)
+        for guard in guards if guard not in known_guards
+    )
+    db.session.add_all(
+        GuardStationStats(account=account, guard=guard, station=station, minutes=0)
+        for guard, stations in contribution["stations"].items()
+        for station in stations if (guard, station) not in known_stations
+    )
+    db.session.flush()
+
+    guard_table = GuardStats.__table__
+    db.session.execute(
+        guard_table.update()
+        .where(guard_table.c.account == account, guard_table.c.guard == bindparam("guard_name"))
+        .values(minutes=guard_table.c.minutes + bindparam("minutes_delta"),
+                demand_minutes=guard_table.c.demand_minutes + bindparam("demand_delta")),
+        [
+            {"guard_name": guard, "minutes_delta": sign * sum(stations.values()),
+             "demand_delta": sign * contribution["demand"][guard]}
+            for guard, stations in contribution["stations"].items()
+        ],
+    )
+
+    station_params = [
+        {"guard_name": guard, "station_name": station, "minutes_delta": sign * minutes}
+        for guard, stations in contribution["stations"].items()
+        for station, minutes in stations.items()
+    ]
+    if station_params:
+        station_table = GuardStationStats.__table__
+        db.session.execute(
+            station_table.update()
+            .where(station_table.c.account == account,
+                   station_table.c.guard == bindparam("guard_name"),
+                   station_table.c.station == bindparam("station_name"))
+            .values(minutes=station_table.c.minutes + bindparam("minutes_delta")),
+            station_params,
+        )
+
+def lock_finalized_schedule(account, day):
+    #a no-op update takes the row's write lock before its contribution is read, so two regenerations
+    #can't both subtract the same previous contribution; None if the day has no row yet
+    locked = FinalizedSchedule.query.filter_by(account=account, day=day).update(
+        {FinalizedSchedule.day: day}, synchronize_session=False)
+    if not locked:
+        return None
+    return FinalizedSchedule.query.filter_by(account=account, day=day).populate_existing().one()
+
+def finalize_schedule(account, scheduler):
+    #one finalized schedule per account per day, regenerating replaces that day's share of the running totals
+    contribution = schedule_contribution(scheduler)
+    today = date.today()
+
+    #a concurrent first generation of the day wins the unique insert, the loser retries as a regeneration
+    for attempt in range(2):
+        try:
+            with db.session.no_autoflush:
+                finalized = lock_finalized_schedule(account, today)
+                if finalized is None:
+                    finalized = FinalizedSchedule(account=account, day=today)
+                    db.session.add(finalized)
+                    db.session.flush()
+                elif finalized.contribution:
+                    apply_contribution(account, finalized.contribution, -1)
+
+                apply_contribution(account, contribution, 1)
+                finalized.contribution = contribution
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if attempt:
+                app.logger.exception("Failed saving fairness statistics")
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Failed saving fairness statistics")
+            break
+
+    try:
+        SCHEDULE_ARCHIVE.store(account, today, scheduler)
+    except Exception:
+        app.logger.exception("Failed archiving schedule")
+
+def shifts_from_form(form):
+    #returns the shift rows posted by shifts.html, or None if any start is after its end
+    guard_names = form.getlist("guard_name[]")
+    start_times = form.getlist("start_time[]")
+    end_times = form.getlist("end_time[]")
+    attendance = [i == "true" for i in form.getlist("attendance[]")]
+    lunch_break = [i == "true" for i in form.getlist("lunch_break[]")]
 
+    for i in range(len(start_times)):
+        if time_to_minutes(start_times[i]) > time_to_minutes(end_times[i]):
+            return None
+
+    return [[g, s, e, a, lb] for g, s, e, a, lb in zip(guard_names, start_times, end_times, attendance, lunch_break)]
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+def is_admin(user):
+    return user.is_authenticated and user.email in app.config['ADMIN_EMAILS']
+
+def admin_required(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not is_admin(current_user):
+            flash("Admins only", "danger")
+            return redirect(url_for("index"))
+        return view(*args, **kwargs)
+    return login_required(wrapped)
+
+@app.context_processor
+def inject_admin():
+    return {"is_admin": is_admin(current_user)}
+
+def ensure_indexes():
+    #create_all skips tables that already exist, so indexes added to older tables are created here
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
 def initialize_default_data():
     demo_user = User.query.first()
     if not demo_user:
@@ -125,7 +396,12 @@ def initialize_default_data():
 @app.route('/')
 @login_required
 def index():
-    return render_template('index.html')
+    return cached_schedule_page('index.html')
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    return cached_schedule_page('dashboard.html')
 
 @app.route('/login',methods=["GET","POST"])
 def login():
@@ -170,8 +446,9 @@ def fixed_vars():
     starts_and_ends["Lunch End Time"] = preferences.acceptable_lunch_end
 
     coverage_times = preferences.station_coverage_times
+    feasibility = feasibility_check(preferences).messages() if preferences.shifts else []
 
-    return render_template('fixed_vars.html',vars_list=starts_and_ends,coverage_times=coverage_times)
+    return render_template('fixed_vars.html',vars_list=starts_and_ends,coverage_times=coverage_times,feasibility=feasibility)
 
 @app.route('/rotation-cycle', methods=["GET", "POST"])
 @login_required
@@ -278,24 +555,11 @@ def importance():
 def shifts():
     preferences = Preferences.query.filter_by(account=current_user.id).first()
     if request.method == "POST":
-        guard_names = request.form.getlist("guard_name[]")
-        start_times = request.form.getlist("start_time[]")
-        end_times = request.form.getlist("end_time[]")
-
-        attendance = request.form.getlist("attendance[]")
-        print(attendance, len(attendance))
-        attendance = [i == "true" for i in attendance]
-
-        lunch_break = request.form.getlist("lunch_break[]")
-        print(lunch_break, len(lunch_break))
-        lunch_break = [i == "true" for i in lunch_break]
+        shifts = shifts_from_form(request.form)
+        if shifts is None:
+            flash("All start times must be before end times", "danger")
+            return redirect(url_for("shifts"))
 
-        for i in range(len(start_times)):
-            if time_to_minutes(start_times[i]) > time_to_minutes(end_times[i]):
-                flash("All start times must be before end times", "danger")
-                return redirect(url_for("shifts"))
-
-        shifts = [[g, s, e, a, lb] for g, s, e, a, lb in zip(guard_names, start_times, end_times, attendance,lunch_break)]
         preferences.shifts = shifts
         flag_modified(preferences,"shifts")
         try:
@@ -308,72 +572,138 @@ def shifts():
         return redirect(url_for("shifts"))
 
     shifts_list = preferences.shifts or []
-    return render_template('shifts.html',shifts_list=shifts_list, enumerate=enumerate)
+    feasibility = feasibility_check(preferences).messages() if shifts_list else []
+    return render_template('shifts.html',shifts_list=shifts_list, enumerate=enumerate, feasibility=feasibility)
 
 @app.route('/generate_schedule',methods=["POST"])
 @login_required
 def generate_schedule():
     preferences = Preferences.query.filter_by(account=current_user.id).first()
 
-    start = preferences.schedule_start
-    end = preferences.schedule_end
-    lunch_start = preferences.acceptable_lunch_start
-    lunch_end = preferences.acceptable_lunch_end
-    
-    # block of code to reduce acceptable lunch end by an hour, so that it ends at time and not starts at that time
-    lunch_end = time_to_minutes(lunch_end) - 60
-    lunch_end = minutes_to_time(lunch_end)
-
-    cycle = preferences.rotation_cycle
-    importance = preferences.station_importance
-    coverage_times = {i:[("11:00", "20:00")] for i in cycle} #change later
-    #essentially marks them abscent bc they can never be considered an available guard
-    # start_time <= time < end_time
-    shifts = [[a,b,c] if d else [a,"00:00","00:00"] for a,b,c,d,_ in preferences.shifts]
-    lunches = [e for _,_,_,_,e in preferences.shifts]
-
-    scheduler = Scheduler(start,
-                          end,
-                          lunch_start,
-                          lunch_end,
-                          cycle,
-                          importance,
-                          coverage_times,
-                          shifts)
-    scheduler.manually_override_lunches(lunches)
-    scheduler.schedule_lunches()
-    scheduler.create_base_schedule()
+    result = feasibility_check(preferences).run()
+    if not result["lunch"]["window_ok"]:
+        flash("The acceptable lunch window must be longer than an hour, fix it under Fixed Variables.", "danger")
+        return redirect(url_for("index"))
+    if result["uncovered"]:
+        for window in result["uncovered"]:
+            flash(f"Nobody is on duty {window['start']} - {window['end']}, fix it under Shifts.", "danger")
+        return redirect(url_for("index"))
+
+    optimize = request.form.get("optimize") == "true"
+    priority = guard_priority(current_user.id)
+    scheduler = build_schedule(preferences, optimize=optimize, priority=priority)
+    finalize_schedule(current_user.id, scheduler)
+    DASHBOARD_CACHE.put(current_user.id, dashboard_version(preferences), render_schedule_fragment(scheduler))
+    LAST_SCHEDULES[current_user.id] = {"snapshot": snapshot(scheduler), "priority": priority, "optimize": optimize}
 
     writer = XLSXWriter(scheduler)
-    excel_file = writer.convert_to_excel()
-    
-    return send_file(
-        excel_file,
-        as_attachment=True,
-        download_name="schedule.xlsx",
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    if request.form.get("format") == "csv":
+        return Response(
+            stream_with_context(writer.iter_csv()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=schedule.csv"}
+        )
+
+    return Response(
+        stream_with_context(writer.iter_excel()),
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": "attachment; filename=schedule.xlsx"}
     )
 
+@app.route("/preview", methods=["POST"])
+@login_required
+def preview():
+    #unsaved shifts from shifts.html, rendered as a fragment, nothing is finalized
+    preferences = Preferences.query.filter_by(account=current_user.id).first()
+    shifts = shifts_from_form(request.form)
+    if shifts is None:
+        return render_template("schedule_preview.html", error="All start times must be before end times")
+    if not shifts:
+        return render_template("schedule_preview.html", error="Add a shift to see a preview")
+    return schedule_fragment(preferences, shifts)
+
+@app.route("/what-if", methods=["POST"])
+@login_required
+def what_if():
+    #{"scenarios": [{"name": ..., "absent": [...], "shifts": {name: [start, end]}, "add": [...], "close": [...]}]}
+    scenarios = (request.get_json(silent=True) or {}).get("scenarios")
+    if not isinstance(scenarios, list) or not scenarios:
+        return jsonify({"error": "expected a non-empty scenarios list"}), 400
+    errors = {}
+    for i, scenario in enumerate(scenarios):
+        error = perturbation_error(scenario)
+        if error:
+            errors[i] = error
+    if errors:
+        return jsonify({"error": "invalid scenarios", "scenarios": errors}), 400
+
+    preferences = Preferences.query.filter_by(account=current_user.id).first()
+    state = preferences_state(preferences)
+    runner = ScenarioRunner(state, STATION_CACHE.station_map(state), priority=guard_priority(current_user.id))
+    return jsonify({"baseline": runner.run([{"name": "baseline"}])[0], "scenarios": runner.run(scenarios)})
+
+@app.route("/feasibility")
+@login_required
+def feasibility():
+    preferences = Preferences.query.filter_by(account=current_user.id).first()
+    return jsonify(feasibility_check(preferences).run())
+
+@app.route("/fairness")
+@login_required
+def fairness():
+    guards = {
+        s.guard: {"minutes": s.minutes, "demand_minutes": round(s.demand_minutes, 2), "stations": {}}
+        for s in GuardStats.query.filter_by(account=current_user.id)
+    }
+    for s in GuardStationStats.query.filter_by(account=current_user.id):
+        if s.guard in guards and s.minutes:
+            guards[s.guard]["stations"][s.station] = s.minutes
+    return jsonify(guards)
+
+@app.route("/analytics/hours")
+@login_required
+def analytics_hours():
+    #?station=Main&start=2025-08-01&end=2025-08-31, defaults to the current month and every station
+    today = date.today()
+    try:
+        start = date.fromisoformat(request.args.get("start", today.replace(day=1).isoformat()))
+        end = date.fromisoformat(request.args.get("end", today.isoformat()))
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD"}), 400
+
+    station = request.args.get("station")
+    if station:
+        minutes = SCHEDULE_ARCHIVE.station_minutes(current_user.id, station, start, end)
+        return jsonify({guard: m / 60 for guard, m in minutes.items()})
+
+    minutes = SCHEDULE_ARCHIVE.guard_minutes(current_user.id, start, end)
+    return jsonify({guard: {s: m / 60 for s, m in stations.items()} for guard, stations in minutes.items()})
+
 @app.route("/report_bug", methods=["POST"])
 def report_bug():
     bug_desc = request.form.get("bug_description")
 
-    time = datetime.now(timezone.utc)
-
     bug_report = BugReport(
         report_user_id = current_user.id,
-        bug_description = bug_desc,
-        time_stamp=time
+        bug_description = bug_desc
     )
     db.session.add(bug_report)
     db.session.commit()
 
-    bug_report = BugReport.query.filter_by(time_stamp=time).first()
-
     report = Report(bug_report)
 
     report.fetch_account_state(db, Preferences)
 
+    last = LAST_SCHEDULES.get(current_user.id)
+    if last is not None:
+        #rebuilt the way the download was, so only changed preferences show up in the diff
+        preferences = Preferences.query.filter_by(account=current_user.id).first()
+        try:
+            scheduler = build_schedule(preferences, optimize=last["optimize"], priority=last["priority"])
+            report.compare_schedules(last["snapshot"], snapshot(scheduler))
+        except Exception:
+            app.logger.exception("Failed rebuilding schedule for bug report")
+
     logger = Logger(LOG_PATH)
     logger.write_report(report)
 
@@ -381,6 +711,42 @@ def report_bug():
     return redirect(url_for("index"))
 
 
+@app.route("/admin/bug-reports")
+@admin_required
+def bug_reports():
+    #keyset pagination on the primary key, newest first, ?after=<id> continues below that id
+    show = request.args.get("show", "open")
+    after = request.args.get("after", type=int)
+
+    query = BugReport.query
+    if show == "open":
+        query = query.filter(BugReport.resolved.is_(False))
+    if after is not None:
+        query = query.filter(BugReport.id < after)
+    reports = query.order_by(BugReport.id.desc()).limit(BUG_REPORTS_PER_PAGE + 1).all()
+
+    next_after = reports[BUG_REPORTS_PER_PAGE - 1].id if len(reports) > BUG_REPORTS_PER_PAGE else None
+    return render_template("bug_reports.html", reports=reports[:BUG_REPORTS_PER_PAGE],
+                           show=show, next_after=next_after)
+
+@app.route("/admin/bug-reports/resolve", methods=["POST"])
+@admin_required
+def resolve_bug_reports():
+    ids = request.form.getlist("report_id[]", type=int)
+    if not ids:
+        flash("No bug reports selected.", "warning")
+        return redirect(request.referrer or url_for("bug_reports"))
+
+    BugReport.query.filter(BugReport.id.in_(ids)).update({"resolved": True}, synchronize_session=False)
+    try:
+        db.session.commit()
+        flash(f"Resolved {len(ids)} bug report(s).", "success")
+    except Exception:
+        db.session.rollback()
+        app.logger.exception("Failed resolving bug reports")
+        flash("Failed to resolve bug reports.", "danger")
+    return redirect(request.referrer or url_for("bug_reports"))
+
 @app.errorhandler(404)
 def not_found_error(error):
     return render_template('404.html'), 404
@@ -393,6 +759,7 @@ def internal_error(error):
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        ensure_indexes()
         initialize_default_data()    
 
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+from datetime import date
+
+import numpy as np
+
+from .scheduler import Scheduler
+from .utils import rotation_order
+
+
+class ScheduleArchive:
+    #one int16 .npy per account per day (ticks x stations in rotation order, 0 based guard ids, -1 unstaffed)
+    #plus a .json beside it with the labels needed to read it back, one file per day so concurrent
+    #writers for the same account never read-modify-write shared metadata
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def account_dir(self, account: int) -> str:
+        return os.path.join(self.root, str(account))
+
+    def load_index(self, account: int, start: date, end: date) -> dict:
+        #day -> labels for days in [start, end], file names are filtered before any metadata is opened
+        #archives written before per-day metadata keep theirs in index.json
+        directory = self.account_dir(account)
+        if not os.path.isdir(directory):
+            return {}
+        first, last = start.isoformat(), end.isoformat()
+
+        index = {}
+        legacy = os.path.join(directory, "index.json")
+        if os.path.exists(legacy):
+            with open(legacy, encoding="utf-8") as f:
+                index.update((day, entry) for day, entry in json.load(f).items() if first <= day <= last)
+        for name in os.listdir(directory):
+            day, ext = os.path.splitext(name)
+            if ext == ".json" and name != "index.json" and first <= day <= last:
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    index[day] = json.load(f)
+        return index
+
+    def write_atomic(self, path: str, write):
+        directory = os.path.dirname(path)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+
+    def store(self, account: int, day: date, scheduler: Scheduler):
+        directory = self.account_dir(account)
+        os.makedirs(directory, exist_ok=True)
+
+        matrix = rotation_order(scheduler).astype(np.int16)
+        self.write_atomic(os.path.join(directory, f"{day.isoformat()}.npy"), lambda f: np.save(f, matrix))
+
+        #written after the array so a day only shows up once its matrix is in place
+        data = json.dumps({
+            "start": scheduler.start,
+            "stations": list(scheduler.rotation_cycle),
+            "guards": [guard.name for guard in scheduler.guards],
+        }, sort_keys=True).encode("utf-8")
+        self.write_atomic(os.path.join(directory, f"{day.isoformat()}.json"), lambda f: f.write(data))
+
+    def days(self, account: int, start: date, end: date):
+        #(day, memory mapped matrix, index entry) for archived days in [start, end]
+        index = self.load_index(account, start, end)
+        for day in sorted(index):
+            matrix = np.load(os.path.join(self.account_dir(account), f"{day}.npy"), mmap_mode="r")
+            yield day, matrix, index[day]
+
+    def station_minutes(self, account: int, station: str, start: date, end: date) -> dict:
+        #minutes each guard spent at station between start and end, one bincount per archived day
+        totals = {}
+        for _, matrix, entry in self.days(account, start, end):
+            if station not in entry["stations"]:
+                continue
+            column = np.asarray(matrix[:, entry["stations"].index(station)])
+            counts = np.bincount(column[column != -1], minlength=len(entry["guards"]))
+            for g in np.nonzero(counts)[0]:
+                name = entry["guards"][g]
+                totals[name] = totals.get(name, 0) + int(counts[g]) * 15
+        return totals
+
+    def guard_minutes(self, account: int, start: date, end: date) -> dict:
+        #guard -> station -> minutes between start and end
+        totals = {}
+        for _, matrix, entry in self.days(account, start, end):
+            stations, guards = entry["stations"], entry["guards"]
+            staffed = np.asarray(matrix) != -1
+            rows, cols = np.nonzero(staffed)
+            flat = np.asarray(matrix)[rows, cols].astype(int) * len(stations) + cols
+            counts = np.bincount(flat, minlength=len(guards) * len(stations)).reshape(len(guards), len(stations))
+            for g, s in zip(*np.nonzero(counts)):
+                per_station = totals.setdefault(guards[g], {})
+                per_station[stations[s]] = per_station.get(stations[s], 0) + int(counts[g, s]) * 15
+        return totals
@@ -0,0 +1,35 @@
+import numpy as np
+
+from .scheduler import Scheduler
+
+
+def demand_weights(scheduler: Scheduler) -> dict:
+    #most important station weighs 1, least important 1/n, fodder stations 0
+    ranked = [name for name in scheduler.station_importance_descending[::-1] if "Standby" not in name]
+    return {name: (len(ranked) - i) / len(ranked) for i, name in enumerate(ranked)}
+
+
+def schedule_contribution(scheduler: Scheduler) -> dict:
+    #minutes each guard spent at each station in one finished schedule, plus demand weighted minutes per guard
+    matrix = np.asarray(scheduler.schedule)
+    stations = scheduler.station_importance_descending[::-1]
+    num_guards, num_stations = len(scheduler.guards), len(stations)
+
+    rows, cols = np.nonzero(matrix != -1)
+    guards = matrix[rows, cols] - 1
+    minutes = np.bincount(guards * num_stations + cols, minlength=num_guards * num_stations)
+    minutes = minutes.reshape(num_guards, num_stations) * 15
+
+    weights = demand_weights(scheduler)
+    column_weights = np.array([weights.get(name, 0) for name in stations])
+    demand = minutes @ column_weights
+
+    contribution = {"stations": {}, "demand": {}}
+    for g, guard in enumerate(scheduler.guards):
+        if not minutes[g].any():
+            continue
+        contribution["stations"][guard.name] = {
+            stations[s]: int(minutes[g, s]) for s in np.nonzero(minutes[g])[0]
+        }
+        contribution["demand"][guard.name] = float(demand[g])
+    return contribution
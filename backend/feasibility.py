@@ -0,0 +1,111 @@
+import numpy as np
+
+from .scheduler import Scheduler
+from .utils import minutes_to_time, military_to_normal
+
+
+class FeasibilityCheck:
+    #compares guard supply against station demand and lunch needs on the 15 minute grid, without scheduling
+
+    def __init__(self, scheduler: Scheduler):
+        self.scheduler = scheduler
+        self.start = scheduler.start
+        self.ticks = max(0, -(-(scheduler.end - scheduler.start) // 15))
+
+        self.supply = self.count_open([(g.start_time, g.end_time) for g in scheduler.guards if g.start_time < g.end_time])
+        self.demand = self.count_open([
+            (start, end)
+            for station in scheduler.station_map.values()
+            for start, end in station.minutes_when_open()
+        ])
+        self.surplus = self.supply - self.demand
+        #prefix sums of spare guards so any window's lunch capacity is O(1)
+        self.spare = np.concatenate([[0], np.cumsum(np.maximum(self.surplus, 0))])
+
+    def tick(self, minutes):
+        #first tick at or after minutes, clipped to the grid
+        return int(min(max(-(-(minutes - self.start) // 15), 0), self.ticks))
+
+    def count_open(self, intervals):
+        #how many of the [start, end) intervals cover each tick, via a difference array
+        diff = np.zeros(self.ticks + 1, dtype=int)
+        for start, end in intervals:
+            np.add.at(diff, [self.tick(start), self.tick(end)], [1, -1])
+        return np.cumsum(diff)[:-1]
+
+    def windows(self, mask):
+        #runs of True ticks as (start tick, end tick) pairs
+        edges = np.diff(np.concatenate([[0], mask.astype(int), [0]]))
+        return list(zip(np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]))
+
+    def label(self, tick):
+        return military_to_normal(minutes_to_time(self.start + 15 * int(tick)))
+
+    def run(self) -> dict:
+        scheduler = self.scheduler
+        #create_base_schedule can't staff a tick with nobody on duty and raises
+        uncovered = [
+            {"start": self.label(a), "end": self.label(b)}
+            for a, b in self.windows(self.supply == 0)
+        ]
+        understaffed = [
+            {"start": self.label(a), "end": self.label(b), "short_by": int(-self.surplus[a:b].min())}
+            for a, b in self.windows(self.surplus < 0)
+        ]
+        #create_base_schedule adds a Standby station whenever guards outnumber the rotation
+        extra = self.supply - len(scheduler.rotation_cycle)
+        overstaffed = [
+            {"start": self.label(a), "end": self.label(b), "extra": int(extra[a:b].max())}
+            for a, b in self.windows(extra > 0)
+        ]
+
+        lunch_guards = [g for g in scheduler.guards if g.lunch_break and g.start_time < g.end_time]
+        #schedule_lunches only tries start times in [lunch_start, lunch_end), an empty range never terminates
+        window_ok = scheduler.lunch_start < scheduler.lunch_end or not lunch_guards
+
+        lunch_starts = range(scheduler.lunch_start, scheduler.lunch_end, 15)
+        unfit = [
+            g.name for g in lunch_guards
+            if not any(g.start_time <= t and t + 60 <= g.end_time for t in lunch_starts)
+        ]
+
+        span_start = self.tick(scheduler.lunch_start)
+        span_end = self.tick(scheduler.lunch_end + 60)
+        capacity = int(self.spare[span_end] - self.spare[span_start])
+        needed = 4 * len(lunch_guards)
+
+        return {
+            "feasible": window_ok and not uncovered and not understaffed and not unfit and needed <= capacity,
+            "uncovered": uncovered,
+            "understaffed": understaffed,
+            "overstaffed": overstaffed,
+            "lunch": {
+                "window_ok": window_ok,
+                "needed": needed,
+                "capacity": capacity,
+                "unfit": unfit,
+            },
+        }
+
+    def messages(self, result: dict = None) -> list:
+        #(message, category) pairs ready for flash
+        result = result or self.run()
+        messages = []
+        lunch = result["lunch"]
+        if not lunch["window_ok"]:
+            messages.append(("The acceptable lunch window must be longer than an hour, lunches cannot be scheduled.", "danger"))
+        for window in result["uncovered"]:
+            messages.append((f"Nobody is on duty {window['start']} - {window['end']}, "
+                             f"a schedule cannot be generated.", "danger"))
+        for window in result["understaffed"]:
+            messages.append((f"Understaffed {window['start']} - {window['end']}: "
+                             f"short by {window['short_by']} guard(s).", "warning"))
+        if lunch["unfit"]:
+            messages.append((f"No lunch slot fits inside the shift of: {', '.join(lunch['unfit'])}.", "warning"))
+        if lunch["needed"] > lunch["capacity"]:
+            messages.append((f"Lunches need {lunch['needed'] * 15} guard-minutes but only "
+                             f"{lunch['capacity'] * 15} are spare in the lunch window, stations will close.", "warning"))
+        for window in result["overstaffed"]:
+            messages.append((f"{window['extra']} more guard(s) than stations {window['start']} - {window['end']}, "
+                             f"Standby stations will be added.", "info"))
+        return messages
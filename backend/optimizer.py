@@ -0,0 +1,207 @@
+import copy
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .scheduler import Scheduler
+from .utils import rotation_anomalies, rotation_order
+
+#upper bound on search processes per optimize call, each request starts its own pool
+MAX_WORKERS = 4
+
+DEFAULT_WEIGHTS = {
+    "coverage": 1.0,    #per staffed tick, times the station's importance rank
+    "anomaly": 10.0,    #per greyed out rotation anomaly cell
+    "lunch": 1.0,       #per 15 minutes a lunch sits away from the middle of the shift
+}
+
+
+def build_schedule(template: Scheduler, lunches: dict) -> Scheduler:
+    #template has lunches scheduled but no base schedule yet, it is never mutated
+    scheduler = copy.deepcopy(template)
+    for i, start in lunches.items():
+        scheduler.guards[i].lunch_break_start = start
+        scheduler.guards[i].lunch_break_end = start + 60
+    scheduler.create_base_schedule()
+    return scheduler
+
+
+def score(scheduler: Scheduler, station_weights: dict, weights: dict) -> float:
+    matrix = np.asarray(scheduler.schedule)
+    column_weights = np.array([station_weights.get(name, 0) for name in scheduler.station_importance_descending[::-1]])
+    coverage = float(((matrix != -1) * column_weights).sum())
+
+    anomalies = int(rotation_anomalies(rotation_order(scheduler)).sum())
+
+    lunch = 0.0
+    for guard in scheduler.guards:
+        if guard.lunch_break and guard.lunch_break_end:
+            middle = (guard.start_time + guard.end_time) / 2
+            lunch += abs(guard.lunch_break_start + 30 - middle) / 15
+
+    return weights["coverage"] * coverage - weights["anomaly"] * anomalies - weights["lunch"] * lunch
+
+
+def try_score(template, lunches, station_weights, weights) -> float:
+    #lunches that leave a tick with nobody on duty can't be scheduled, they score as rejected
+    try:
+        return score(build_schedule(template, lunches), station_weights, weights)
+    except (IndexError, ValueError):
+        return float("-inf")
+
+
+def search_lunches(template, options, lunches, station_weights, weights, deadline, seed):
+    #randomized hill climb over lunch start times, returns the best (score, lunches) found before deadline
+    rng = random.Random(seed)
+    current = dict(lunches)
+    current_score = try_score(template, current, station_weights, weights)
+    best, best_score = dict(current), current_score
+
+    movable = [i for i in options if len(options[i]) > 1]
+    if not movable:
+        return best_score, best
+
+    stale = 0
+    while time.monotonic() < deadline:
+        candidate = dict(current)
+        if len(movable) > 1 and rng.random() < 0.3:
+            a, b = rng.sample(movable, 2)
+            if candidate[b] in options[a] and candidate[a] in options[b]:
+                candidate[a], candidate[b] = candidate[b], candidate[a]
+        else:
+            i = rng.choice(movable)
+            candidate[i] = rng.choice(options[i])
+
+        candidate_score = try_score(template, candidate, station_weights, weights)
+        if candidate_score == float("-inf"):
+            stale += 1
+        elif candidate_score >= current_score:
+            stale = 0 if candidate_score > current_score else stale + 1
+            current, current_score = candidate, candidate_score
+            if current_score > best_score:
+                best, best_score = dict(current), current_score
+        else:
+            stale += 1
+
+        #restart from a random point once the climb has flattened out
+        if stale > 50 * len(movable):
+            current = {i: rng.choice(options[i]) if i in movable else start for i, start in current.items()}
+            current_score = try_score(template, current, station_weights, weights)
+            stale = 0
+
+    return best_score, best
+
+
+class ScheduleOptimizer:
+
+    def __init__(self, scheduler: Scheduler, time_budget: float = 2.0, workers: int = None, weights: dict = None):
+        #scheduler must have had schedule_lunches called but not create_base_schedule
+        self.template = copy.deepcopy(scheduler)
+        self.time_budget = time_budget
+        self.workers = workers or min(MAX_WORKERS, os.cpu_count() or 1)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+        ranked = scheduler.station_importance_descending[::-1]
+        self.station_weights = {name: len(ranked) - i for i, name in enumerate(ranked)}
+
+        self.lunches = {
+            i: guard.lunch_break_start
+            for i, guard in enumerate(self.template.guards)
+            if guard.lunch_break and guard.lunch_break_end
+        }
+        self.options = {i: self.lunch_options(i) for i in self.lunches}
+
+        self.greedy_score = None
+        self.best_score = None
+
+    def lunch_options(self, index):
+        guard = self.template.guards[index]
+        options = [
+            t for t in range(self.template.lunch_start, self.template.lunch_end, 15)
+            if guard.start_time <= t and t + 60 <= guard.end_time
+        ]
+        if self.lunches[index] not in options:
+            options.append(self.lunches[index])
+        return options
+
+    def optimize(self) -> Scheduler:
+        began = time.monotonic()
+        deadline = began + self.time_budget
+
+        greedy = build_schedule(self.template, self.lunches)
+        self.greedy_score = score(greedy, self.station_weights, self.weights)
+
+        #leave a slice of the budget for the anomaly repair pass
+        search_deadline = began + self.time_budget * 0.8
+        best_score, best_lunches = self.greedy_score, self.lunches
+        for found_score, found_lunches in self.run_searches(search_deadline):
+            if found_score > best_score:
+                best_score, best_lunches = found_score, found_lunches
+
+        best = greedy if best_lunches is self.lunches else build_schedule(self.template, best_lunches)
+        best = self.repair_anomalies(best, deadline)
+        best_score = score(best, self.station_weights, self.weights)
+
+        if best_score <= self.greedy_score:
+            self.best_score = self.greedy_score
+            return greedy
+        self.best_score = best_score
+        return best
+
+    def run_searches(self, deadline):
+        args = (self.template, self.options, self.lunches, self.station_weights, self.weights, deadline)
+        if self.workers == 1:
+            return [search_lunches(*args, 0)]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(search_lunches, *args, seed) for seed in range(self.workers)]
+            return [future.result() for future in futures]
+
+    def repair_anomalies(self, scheduler: Scheduler, deadline) -> Scheduler:
+        #swap two guards for the stretch both are on duty after an anomaly, keep swaps that remove anomalies
+        matrix = np.asarray(scheduler.schedule)
+        importance_index = {name: i for i, name in enumerate(scheduler.station_importance_descending[::-1])}
+        columns = [importance_index[station] for station in scheduler.rotation_cycle]
+
+        def anomaly_count(m):
+            return int(rotation_anomalies(np.where(m == -1, -1, m - 1)[:, columns]).sum())
+
+        current = anomaly_count(matrix)
+        improved = True
+        while improved and current and time.monotonic() < deadline:
+            improved = False
+            anomaly_ticks = np.nonzero(rotation_anomalies(np.where(matrix == -1, -1, matrix - 1)[:, columns]).any(axis=1))[0]
+            for tick in anomaly_ticks:
+                if tick + 1 >= len(matrix) or time.monotonic() >= deadline:
+                    continue
+                on_duty = [g for g in matrix[tick + 1] if g != -1]
+                for a_index, a in enumerate(on_duty):
+                    for b in on_duty[a_index + 1:]:
+                        candidate = self.swap_guards(matrix, tick + 1, a, b)
+                        count = anomaly_count(candidate)
+                        if count < current:
+                            matrix, current, improved = candidate, count, True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+
+        scheduler.schedule = matrix.tolist()
+        return scheduler
+
+    def swap_guards(self, matrix, tick, a, b):
+        present = (matrix == a).any(axis=1) & (matrix == b).any(axis=1)
+        end = tick
+        while end < len(matrix) and present[end]:
+            end += 1
+
+        swapped = matrix.copy()
+        window = swapped[tick:end]
+        a_cells, b_cells = window == a, window == b
+        window[a_cells] = b
+        window[b_cells] = a
+        return swapped
@@ -0,0 +1,85 @@
+import json
+import threading
+from collections import OrderedDict
+
+from .scheduler import Scheduler
+from .station import Station
+from .utils import minutes_to_time, military_to_normal, rotation_anomalies, rotation_order
+
+
+class StationCache:
+    #compiled Station maps keyed by the coverage layout, shared by every scheduler built from the same settings
+
+    def __init__(self, size: int = 128):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def station_map(self, state: dict) -> dict:
+        coverage_times = Scheduler.coverage_times_for(state)
+        key = json.dumps(coverage_times, sort_keys=True)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        station_map = {name: Station(name, times) for name, times in coverage_times.items()}
+        with self.lock:
+            self.entries[key] = station_map
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return station_map
+
+    def scheduler(self, state: dict) -> Scheduler:
+        return Scheduler.from_state(state, self.station_map(state))
+
+
+class FragmentCache:
+    #rendered html fragments keyed by (account, version), putting a new version drops the account's older ones
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, account: int, version: str):
+        key = (account, version)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        return None
+
+    def put(self, account: int, version: str, html: str):
+        #replaces whatever the account had cached under an older version
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == account]:
+                del self.entries[key]
+            self.entries[(account, version)] = html
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+def schedule_table(scheduler: Scheduler) -> dict:
+    #finished schedule laid out for templates: stations in rotation order, guard names per tick, anomalies flagged
+    matrix = rotation_order(scheduler)
+    anomalies = rotation_anomalies(matrix)
+
+    names = [guard.name for guard in scheduler.guards]
+    rows = [
+        {
+            "station": station,
+            "cells": [(names[g] if g != -1 else "", bool(a)) for g, a in zip(matrix[:, s], anomalies[:, s])],
+        }
+        for s, station in enumerate(scheduler.rotation_cycle)
+    ]
+    lunches = [
+        (guard.name, military_to_normal(minutes_to_time(guard.lunch_break_start)))
+        for guard in scheduler.guards
+        if guard.lunch_break and guard.lunch_break_end
+    ]
+    return {
+        "times": [military_to_normal(minutes_to_time(t)) for t in range(scheduler.start, scheduler.end, 15)],
+        "rows": rows,
+        "lunches": lunches,
+    }
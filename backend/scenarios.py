@@ -0,0 +1,149 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .feasibility import FeasibilityCheck
+from .scheduler import Scheduler
+from .utils import rotation_anomalies, rotation_order, time_to_minutes
+
+#below this many scenarios a process pool costs more to start than it saves
+PARALLEL_THRESHOLD = 16
+
+
+def is_time(value) -> bool:
+    try:
+        return isinstance(value, str) and 0 <= time_to_minutes(value) < 24 * 60
+    except ValueError:
+        return False
+
+
+def is_names(value) -> bool:
+    return isinstance(value, list) and all(isinstance(name, str) for name in value)
+
+
+def perturbation_error(perturbation) -> str:
+    #what is wrong with a perturbation's shape, None if apply_perturbation can take it
+    if not isinstance(perturbation, dict):
+        return "must be an object"
+    if not isinstance(perturbation.get("name", ""), str):
+        return "name must be a string"
+    for key in ("absent", "close"):
+        if not is_names(perturbation.get(key, [])):
+            return f"{key} must be a list of names"
+
+    edits = perturbation.get("shifts", {})
+    if not isinstance(edits, dict):
+        return "shifts must map guard names to [start, end]"
+    for times in edits.values():
+        if not (isinstance(times, list) and len(times) == 2 and all(map(is_time, times))):
+            return "shifts must map guard names to [start, end]"
+
+    rows = perturbation.get("add", [])
+    if not isinstance(rows, list):
+        return "add must be a list of [name, start, end, attendance, lunch break] rows"
+    for row in rows:
+        if not (isinstance(row, list) and len(row) == 5 and isinstance(row[0], str)
+                and is_time(row[1]) and is_time(row[2]) and isinstance(row[3], bool) and isinstance(row[4], bool)):
+            return "add must be a list of [name, start, end, attendance, lunch break] rows"
+    return None
+
+
+def apply_perturbation(state: dict, perturbation: dict) -> dict:
+    #perturbation keys, all optional:
+    #  absent: [guard names] marked as not attending
+    #  shifts: {guard name: [start, end]} replacement shift times
+    #  add: [[name, start, end, attendance, lunch break]] extra shift rows
+    #  close: [station names] removed from the rotation and importance order
+    absent = set(perturbation.get("absent", []))
+    edits = perturbation.get("shifts", {})
+    closed = set(perturbation.get("close", []))
+
+    shifts = []
+    for name, start, end, attendance, lunch in state["shifts"]:
+        if name in edits:
+            start, end = edits[name]
+        shifts.append([name, start, end, attendance and name not in absent, lunch])
+    shifts.extend(list(row) for row in perturbation.get("add", []))
+
+    return dict(
+        state,
+        shifts=shifts,
+        rotation_cycle=[s for s in state["rotation_cycle"] if s not in closed],
+        station_importance=[s for s in state["station_importance"] if s not in closed],
+    )
+
+
+def evaluate_scenario(state: dict, station_map: dict, priority: dict = None) -> dict:
+    try:
+        scheduler = Scheduler.from_state(state, {name: station_map[name] for name in state["rotation_cycle"]})
+        check = FeasibilityCheck(scheduler)
+        feasibility = check.run()
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    #same tie-breaker /generate_schedule uses, so a scenario matches what would actually be produced
+    scheduler.guard_priority = priority or {}
+    result = {"lunch": feasibility["lunch"], "understaffed": feasibility["understaffed"]}
+
+    if not feasibility["lunch"]["window_ok"]:
+        result["error"] = "The acceptable lunch window must be longer than an hour"
+        return result
+    if feasibility["uncovered"]:
+        result["uncovered"] = feasibility["uncovered"]
+        result["error"] = "Nobody is on duty for part of the day"
+        return result
+
+    try:
+        scheduler.schedule_lunches()
+        scheduler.create_base_schedule()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    matrix = rotation_order(scheduler)
+    stations = scheduler.rotation_cycle
+    times = range(scheduler.start, scheduler.end, 15)
+    should_be_open = np.array(
+        [[name in station_map and station_map[name].should_be_open_at(t) for name in stations] for t in times],
+        dtype=bool,
+    ).reshape(matrix.shape)
+    gaps = should_be_open & (matrix == -1)
+
+    result["coverage_gaps"] = [
+        {"station": station, "start": check.label(a), "end": check.label(b)}
+        for s, station in enumerate(stations)
+        for a, b in check.windows(gaps[:, s])
+    ]
+    result["unstaffed_minutes"] = int(gaps.sum()) * 15
+    result["anomalies"] = int(rotation_anomalies(matrix).sum())
+    result["standby_added"] = sum(1 for s in stations if "Standby" in s)
+    return result
+
+
+def evaluate_perturbation(args):
+    state, perturbation, station_map, priority = args
+    return evaluate_scenario(apply_perturbation(state, perturbation), station_map, priority)
+
+
+class ScenarioRunner:
+    #evaluates many what-if perturbations of one base state, sharing its compiled stations
+
+    def __init__(self, state: dict, station_map: dict, workers: int = None, priority: dict = None):
+        #perturbations must already have passed perturbation_error
+        self.state = state
+        self.station_map = station_map
+        self.workers = workers or os.cpu_count() or 1
+        self.priority = priority
+
+    def run(self, perturbations: list) -> list:
+        tasks = [(self.state, perturbation, self.station_map, self.priority) for perturbation in perturbations]
+        if self.workers == 1 or len(tasks) < PARALLEL_THRESHOLD:
+            results = [evaluate_perturbation(task) for task in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (self.workers * 2))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(evaluate_perturbation, tasks, chunksize=chunksize))
+
+        for perturbation, result in zip(perturbations, results):
+            result["name"] = perturbation.get("name", "")
+        return results
@@ -3,7 +3,7 @@ from .guard import Guard
 from .station import Station
 
 class Scheduler:
-    def __init__(self, start, end, lunch_start, lunch_end, rotation_cycle, importance_order, coverage_times, shifts):
+    def __init__(self, start, end, lunch_start, lunch_end, rotation_cycle, importance_order, coverage_times, shifts, station_map=None):
         self.shifts = shifts
         self.guards = self.schedule_to_class()
         self.complete_schedule = False
@@ -20,7 +20,42 @@ class Scheduler:
         #schedule rows are time, cols are stations, in order of importance not actual rotation thing
         self.schedule = [[-1 for _ in self.rotation_cycle] for _ in range(self.start,self.end,15)]
 
-        self.station_map = {i:Station(i,self.coverage_times[i]) for i in self.rotation_cycle}
+        #stations never change once built, so a cached map can be shared between schedulers
+        if station_map is None:
+            station_map = {i:Station(i,self.coverage_times[i]) for i in self.rotation_cycle}
+        self.station_map = station_map
+
+        #guard name -> share of past time at demanding stations, lower is placed first when guards arrive together
+        self.guard_priority = {}
+
+    @staticmethod
+    def coverage_times_for(state):
+        return {i:[("11:00", "20:00")] for i in state["rotation_cycle"]} #change later
+
+    @classmethod
+    def from_state(cls, state, station_map=None):
+        #state is a dict of Preferences columns, same shape as the json state saves
+        lunch_end = minutes_to_time(time_to_minutes(state["acceptable_lunch_end"]) - 60)
+
+        cycle = list(state["rotation_cycle"])
+        importance = list(state["station_importance"])
+        coverage_times = cls.coverage_times_for(state)
+        #essentially marks them abscent bc they can never be considered an available guard
+        # start_time <= time < end_time
+        shifts = [[a,b,c] if d else [a,"00:00","00:00"] for a,b,c,d,_ in state["shifts"]]
+        lunches = [e for _,_,_,_,e in state["shifts"]]
+
+        scheduler = cls(state["schedule_start"],
+                        state["schedule_end"],
+                        state["acceptable_lunch_start"],
+                        lunch_end,
+                        cycle,
+                        importance,
+                        coverage_times,
+                        shifts,
+                        station_map)
+        scheduler.manually_override_lunches(lunches)
+        return scheduler
 
     def schedule_to_class(self):
         guards = []
@@ -42,6 +77,9 @@ class Scheduler:
                 self.guards[i].lunch_break = lunches[i]
 
 
+    def arrival_order(self, indices):
+        return sorted(indices, key=lambda i: self.guard_priority.get(self.guards[i].name, 0))
+
     def available_guards(self, time_str):
         time = time_to_minutes(time_str)
         availability = [int(g.is_available_at(time)) for g in self.guards]
@@ -121,8 +159,8 @@ class Scheduler:
         prev_availability, prev_num_avail = self.available_guards(minutes_to_time(time))
 
         prev_state = []
-        for i,j in enumerate(prev_availability):
-            if j:prev_state.append(i)
+        for i in self.arrival_order(range(len(prev_availability))):
+            if prev_availability[i]:prev_state.append(i)
 
         for row in range(len(self.schedule)):
             availability,num_avail = self.available_guards(minutes_to_time(time))
@@ -138,14 +176,14 @@ class Scheduler:
                     if not availability[i] and prev_availability[i]:
                         new_state[new_state.index(i)] = -1
                 #if different guards, find an unattended station and man it
-                for i in range(len(availability)):
+                for i in self.arrival_order(range(len(availability))):
                     if availability[i] and not prev_availability[i]:
                         if -1 in new_state:
                             new_state[new_state.index(-1)] = i
                 
             #if more guards than before, open next most impotant station
             if num_avail > prev_num_avail:
-                for guard_num in range(len(availability)):
+                for guard_num in self.arrival_order(range(len(availability))):
                     if availability[guard_num] and guard_num not in new_state:
                         new_state.append(guard_num)
 
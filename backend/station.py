@@ -4,12 +4,17 @@ class Station:
     def __init__(self, name, times_when_open: list):
         self.name = name
         self.times_when_open = times_when_open #list with tuples (start_time,end_time)
+        #parsed once, should_be_open_at is called for every station on every tick
+        self.open_minutes = [(time_to_minutes(start), time_to_minutes(end)) for start, end in times_when_open]
 
     def __repr__(self):
         return self.name
     
     def should_be_open_at(self,time):
-        for item in self.times_when_open:
-            if time_to_minutes(item[0]) <= time < time_to_minutes(item[1]):
+        for start, end in self.open_minutes:
+            if start <= time < end:
                 return True
-        return False
\ No newline at end of file
+        return False
+
+    def minutes_when_open(self):
+        return self.open_minutes
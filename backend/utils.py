@@ -1,5 +1,7 @@
 from datetime import datetime
 
+import numpy as np
+
 
 def time_to_minutes(t: str) -> int:
     h, m = map(int, t.split(":"))
@@ -14,3 +16,49 @@ def military_to_normal(time):
     dt = datetime.strptime(time, "%H:%M")
     result = dt.strftime("%I:%M").lstrip("0")
     return result
+
+def rotation_anomalies(matrix: np.ndarray) -> np.ndarray:
+    #vectorized version of XLSXWriter.detect_rotation_anomalies, matrix is ticks x stations in rotation order
+    ticks, num_stations = matrix.shape
+    anomalies = np.zeros(matrix.shape, dtype=bool)
+    if ticks < 2 or num_stations < 2:
+        return anomalies
+
+    staffed = matrix != -1
+
+    #first staffed column at or after each position, over the cycle laid out twice
+    doubled = np.concatenate([staffed, staffed], axis=1)
+    big = 2 * num_stations
+    positions = np.where(doubled, np.arange(2 * num_stations), big)
+    first_staffed = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1]
+
+    #expected station for someone leaving column s is the next staffed one after s (not s itself)
+    after = first_staffed[1:, 1:num_stations + 1]
+    own = np.arange(num_stations) + num_stations
+    expected = np.where((after == big) | (after == own), -1, after % num_stations)
+
+    guard_count = int(matrix.max()) + 1 if staffed.any() else 1
+    position = np.full((ticks, guard_count), -1)
+    rows, cols = np.nonzero(staffed)
+    position[rows, matrix[rows, cols]] = cols
+
+    current = position[:-1]
+    following = position[1:]
+    moved = (current != -1) & (following != -1)
+    tick, guard = np.nonzero(moved)
+    from_station = current[tick, guard]
+    to_station = following[tick, guard]
+    wanted = expected[tick, from_station]
+    bad = (wanted != -1) & (to_station != wanted)
+
+    anomalies[tick[bad], from_station[bad]] = True
+    anomalies[tick[bad] + 1, to_station[bad]] = True
+    return anomalies
+
+def rotation_order(scheduler) -> np.ndarray:
+    #schedule matrix in rotation order with 0 based guard ids, -1 unstaffed
+    importance_index = {name: i for i, name in enumerate(scheduler.station_importance_descending[::-1])}
+    columns = [importance_index[station] for station in scheduler.rotation_cycle]
+    matrix = np.array(scheduler.schedule, dtype=int).reshape(len(scheduler.schedule), len(scheduler.rotation_cycle))
+    matrix = matrix[:, columns]
+    return np.where(matrix == -1, -1, matrix - 1)
@@ -1,51 +1,59 @@
-import pandas as pd
+import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+import csv
 import io
+import tempfile
 
 from .scheduler import Scheduler
-from .utils import minutes_to_time, military_to_normal
+from .utils import minutes_to_time, military_to_normal, rotation_order, rotation_anomalies
+
+#bytes per chunk when streaming a download, and how much of a workbook stays in memory before spilling to disk
+CHUNK_SIZE = 64 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+ANOMALY_FILL = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
 
 
 class XLSXWriter:
     def __init__(self, scheduler: Scheduler):
         self.scheduler = scheduler
 
-    def convert_to_excel(self):
+    def time_labels(self):
+        times = [minutes_to_time(t) for t in range(self.scheduler.start, self.scheduler.end, 15)]
+        return [military_to_normal(t) for t in times]
+
+    def build_sheet(self, times):
+        #styled headers only, rebuilding in memory is cheaper than copying or reloading a cached skeleton
         wb = Workbook()
         ws = wb.active
         ws.title = "Schedule"
 
-        # build time labels
-        times = [minutes_to_time(t) for t in range(self.scheduler.start, self.scheduler.end, 15)]
-        times = [military_to_normal(t) for t in times]
-
-        # build dataframe
-        df = pd.DataFrame(
-            self.scheduler.schedule,
-            index=times,
-            columns=self.scheduler.station_importance_descending[::-1]
-        )
-        df = df[self.scheduler.rotation_cycle]
-        df = df.T
-
         # headers
         ws['A1'] = 'Time'
         for col_idx, time in enumerate(times, start=2):
             ws.cell(row=1, column=col_idx, value=time)
 
-        # schedule table
         for row_idx, station in enumerate(self.scheduler.rotation_cycle, start=2):
             ws.cell(row=row_idx, column=1, value=station)
-            for col_idx, time in enumerate(times, start=2):
-                value = df.loc[station, time]
-                ws.cell(row=row_idx, column=col_idx, value="" if value == -1 else value)
+
+        self._apply_excel_styling(ws, len(times))
+        return wb
+
+    def convert_to_excel(self, output=None):
+        wb = self.build_sheet(self.time_labels())
+        ws = wb.active
+
+        # schedule table
+        matrix = rotation_order(self.scheduler)
+        for station_idx in range(matrix.shape[1]):
+            for time_idx in range(matrix.shape[0]):
+                guard = int(matrix[time_idx, station_idx])
+                ws.cell(row=station_idx + 2, column=time_idx + 2, value="" if guard == -1 else guard + 1)
 
         # style anomalies
-        anomaly_fill = self._apply_excel_styling(ws, len(times))
-        anomaly_cells = self.detect_rotation_anomalies(df)
-        for row, col in anomaly_cells:
-            ws.cell(row=row, column=col).fill = anomaly_fill
+        for time_idx, station_idx in zip(*np.nonzero(rotation_anomalies(matrix))):
+            ws.cell(row=int(station_idx) + 2, column=int(time_idx) + 2).fill = ANOMALY_FILL
 
         # lunch breaks table (3 rows below schedule)
         lunch_start_row = len(self.scheduler.rotation_cycle) + 4
@@ -60,67 +68,51 @@ class XLSXWriter:
                 current_row += 1
 
         # save to memory for Flask download
-        output = io.BytesIO()
+        if output is None:
+            output = io.BytesIO()
         wb.save(output)
         output.seek(0)
         return output
 
-    
-    def detect_rotation_anomalies(self, df):
-        anomaly_cells = set()
-        
-        time_cols = df.columns.tolist()
-        
-        for time_idx in range(len(time_cols) - 1):
-            current_time = time_cols[time_idx]
-            next_time = time_cols[time_idx + 1]
+    def iter_excel(self):
+        #xlsx is a zip, so it is written to a spooled temp file and then sent in chunks
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as output:
+            self.convert_to_excel(output)
+            while True:
+                chunk = output.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_csv(self):
+        #same layout as the workbook, yielded row by row so the first bytes go out immediately
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush():
+            data = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return data.encode("utf-8")
+
+        times = [military_to_normal(minutes_to_time(t)) for t in range(self.scheduler.start, self.scheduler.end, 15)]
+        writer.writerow(["Time"] + times)
+        yield flush()
+
+        matrix = rotation_order(self.scheduler)
+        for station_idx, station in enumerate(self.scheduler.rotation_cycle):
+            writer.writerow([station] + ["" if g == -1 else g + 1 for g in matrix[:, station_idx]])
+            yield flush()
+
+        writer.writerows([[], [], ["Guard", "Break Start"]])
+        for guard in self.scheduler.guards:
+            if guard.lunch_break:
+                writer.writerow([guard.name, military_to_normal(minutes_to_time(guard.lunch_break_start))])
+        yield flush()
 
-            # guard -> station_idx
-            current_staffed = {}  
-            next_staffed = {}
-            
-            for station_idx, station in enumerate(self.scheduler.rotation_cycle):
-                current_guard = df.loc[station, current_time]
-                next_guard = df.loc[station, next_time]
-                
-                if current_guard != "" and current_guard != -1:
-                    current_staffed[current_guard] = station_idx
-                if next_guard != "" and next_guard != -1:
-                    next_staffed[next_guard] = station_idx
-            
-            for guard in current_staffed:
-                if guard in next_staffed:
-                    current_station_idx = current_staffed[guard]
-                    next_station_idx = next_staffed[guard]
-                    
-                    expected_next_idx = None
-                    
-                    for offset in range(1, len(self.scheduler.rotation_cycle)):
-                        candidate_idx = (current_station_idx + offset) % len(self.scheduler.rotation_cycle)
-                        candidate_station = self.scheduler.rotation_cycle[candidate_idx]
-                        
-                        if df.loc[candidate_station, next_time] != "" and df.loc[candidate_station, next_time] != -1:
-                            expected_next_idx = candidate_idx
-                            break
-                    
-                    if expected_next_idx is not None and next_station_idx != expected_next_idx:
-
-                        anomaly_cells.add((current_station_idx + 2, time_idx + 2))
-                        anomaly_cells.add((next_station_idx + 2, time_idx + 3))
-        
-        return anomaly_cells
 
     def _apply_excel_styling(self, ws, num_time_cols):
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        station_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-        data_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-
-        anomaly_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        header_font = Font(color="FFFFFF", bold=True, size=10)
-        station_font = Font(bold=True, size=10)
-        data_font = Font(size=10)
-        
+        #cells reference named styles so the workbook stays small
         center_alignment = Alignment(horizontal="center", vertical="center")
         
         thin_border = Border(
@@ -129,27 +121,39 @@ class XLSXWriter:
             top=Side(style="thin"),
             bottom=Side(style="thin")
         )
+
+        header_style = NamedStyle(
+            name="schedule_header",
+            fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+            font=Font(color="FFFFFF", bold=True, size=10),
+            alignment=center_alignment,
+            border=thin_border
+        )
+        station_style = NamedStyle(
+            name="schedule_station",
+            fill=PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid"),
+            font=Font(bold=True, size=10),
+            alignment=center_alignment,
+            border=thin_border
+        )
+        data_style = NamedStyle(
+            name="schedule_data",
+            fill=PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid"),
+            font=Font(size=10),
+            alignment=center_alignment,
+            border=thin_border
+        )
+        for style in (header_style, station_style, data_style):
+            ws.parent.add_named_style(style)
         
         for col in range(1, num_time_cols + 2):
-            cell = ws.cell(row=1, column=col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = center_alignment
-            cell.border = thin_border
+            ws.cell(row=1, column=col).style = header_style.name
         
         for row in range(2, len(self.scheduler.rotation_cycle) + 2):
-            station_cell = ws.cell(row=row, column=1)
-            station_cell.fill = station_fill
-            station_cell.font = station_font
-            station_cell.alignment = center_alignment
-            station_cell.border = thin_border
+            ws.cell(row=row, column=1).style = station_style.name
             
             for col in range(2, num_time_cols + 2):
-                data_cell = ws.cell(row=row, column=col)
-                data_cell.fill = data_fill
-                data_cell.font = data_font
-                data_cell.alignment = center_alignment
-                data_cell.border = thin_border
+                ws.cell(row=row, column=col).style = data_style.name
         
         ws.column_dimensions['A'].width = 12
         for col_idx in range(2, num_time_cols + 2):
@@ -158,5 +162,3 @@ class XLSXWriter:
         
         for row in range(1, len(self.scheduler.rotation_cycle) + 2):
             ws.row_dimensions[row].height = 20
-        
-        return anomaly_fill
\ No newline at end of file
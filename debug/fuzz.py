@@ -0,0 +1,178 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+
+from backend.scheduler import Scheduler
+from backend.utils import minutes_to_time
+
+from .schedule_diff import ScheduleDiff, snapshot
+
+SAVE_DIR = os.path.join(os.path.dirname(__file__), "json_state_saves")
+
+STATION_NAMES = [
+    "Kiddie", "Dive", "Main", "Break", "First Aid", "Slide", "Main2", "Rover",
+    "Lap", "See Manager", "Bathroom Break", "Wave", "Lazy River", "Deck",
+]
+
+
+def random_state(rng: random.Random) -> dict:
+    #random Preferences state in the json state save format, always with a lunch window of at least an hour
+    stations = rng.sample(STATION_NAMES, rng.randint(2, len(STATION_NAMES)))
+    importance = rng.sample(stations, len(stations))
+
+    start = rng.randrange(8 * 60, 12 * 60, 15)
+    end = start + rng.randrange(4 * 60, 11 * 60, 15)
+    lunch_start = rng.randrange(start, start + 4 * 60, 15)
+    lunch_end = lunch_start + rng.randrange(75, 5 * 60, 15)
+
+    shifts = []
+    for i in range(rng.randint(1, 20)):
+        shift_start = rng.randrange(start - 60, end, 15)
+        shift_end = rng.randrange(shift_start + 15, end + 75, 15)
+        name = f"Guard {i}" if rng.random() > 0.05 or not shifts else rng.choice(shifts)[0]
+        shifts.append([name, minutes_to_time(shift_start), minutes_to_time(shift_end),
+                       rng.random() > 0.1, rng.random() < 0.4])
+
+    #a relay of attending guards without lunch keeps someone on duty at every tick, otherwise the
+    #reference engine raises on the gap and the run only compares exception strings
+    relay_start = start
+    while relay_start < end:
+        relay_end = min(end, relay_start + rng.randrange(2 * 60, 6 * 60, 15))
+        shifts.append([f"Relay {len(shifts)}", minutes_to_time(relay_start), minutes_to_time(relay_end), True, False])
+        relay_start = relay_end
+    rng.shuffle(shifts)
+
+    #arrival tie-breaker, few distinct values so equal priorities get exercised too
+    names = sorted({shift[0] for shift in shifts})
+    priority = {name: rng.choice([0.0, 0.25, 0.5, 1.0]) for name in names if rng.random() < 0.7}
+
+    return {
+        "id": None,
+        "account": None,
+        "schedule_start": minutes_to_time(start),
+        "schedule_end": minutes_to_time(end),
+        "acceptable_lunch_start": minutes_to_time(lunch_start),
+        "acceptable_lunch_end": minutes_to_time(lunch_end),
+        "rotation_cycle": stations,
+        "station_importance": importance,
+        "station_coverage_times": None,
+        "shifts": shifts,
+        #not a Preferences column, run_engine applies it as Scheduler.guard_priority
+        "guard_priority": priority,
+    }
+
+
+def run_engine(engine, state):
+    #(snapshot or exception repr, seconds)
+    began = time.perf_counter()
+    try:
+        scheduler = engine.from_state(state)
+        scheduler.guard_priority = dict(state.get("guard_priority", {}))
+        scheduler.schedule_lunches()
+        scheduler.create_base_schedule()
+        result = snapshot(scheduler)
+    except Exception as e:
+        result = f"{type(e).__name__}: {e}"
+    return result, time.perf_counter() - began
+
+
+def fails(candidate, state) -> bool:
+    reference, _ = run_engine(Scheduler, state)
+    result, _ = run_engine(candidate, state)
+    return reference != result
+
+
+def minimize(candidate, state: dict) -> dict:
+    #greedy delta debugging: drop shifts, then stations, while the engines still disagree
+    state = json.loads(json.dumps(state))
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(state["shifts"])):
+            trial = dict(state, shifts=state["shifts"][:i] + state["shifts"][i + 1:])
+            if trial["shifts"] and fails(candidate, trial):
+                state, changed = trial, True
+                break
+        if changed:
+            continue
+        for station in state["rotation_cycle"]:
+            if len(state["rotation_cycle"]) <= 2:
+                break
+            trial = dict(state,
+                         rotation_cycle=[s for s in state["rotation_cycle"] if s != station],
+                         station_importance=[s for s in state["station_importance"] if s != station])
+            if fails(candidate, trial):
+                state, changed = trial, True
+                break
+    return state
+
+
+def load_engine(spec: str):
+    #"package.module:ClassName", any Scheduler compatible class with from_state
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "Scheduler")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differential fuzzing of a candidate scheduler against backend.scheduler.")
+    parser.add_argument("--candidate", default="backend.scheduler:Scheduler", help="module:Class of the engine to check")
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", help="json state save to run both engines on and print the diff")
+    parser.add_argument("--max-failures", type=int, default=5, help="stop after saving this many failing inputs")
+    args = parser.parse_args(argv)
+
+    candidate = load_engine(args.candidate)
+
+    if args.replay:
+        with open(args.replay, encoding="utf-8") as f:
+            state = json.load(f)
+        reference, _ = run_engine(Scheduler, state)
+        result, _ = run_engine(candidate, state)
+        if isinstance(reference, str) or isinstance(result, str):
+            print(f"reference: {reference if isinstance(reference, str) else 'ok'}")
+            print(f"candidate: {result if isinstance(result, str) else 'ok'}")
+        else:
+            for line in ScheduleDiff(reference, result).to_log_lines():
+                print(line)
+        return 0 if reference == result else 1
+
+    rng = random.Random(args.seed)
+    reference_time = candidate_time = 0.0
+    ratios = []
+    failures = errors = 0
+    for case in range(args.runs):
+        state = random_state(rng)
+        reference, ref_seconds = run_engine(Scheduler, state)
+        result, cand_seconds = run_engine(candidate, state)
+        errors += isinstance(reference, str)
+        reference_time += ref_seconds
+        candidate_time += cand_seconds
+        ratios.append(ref_seconds / cand_seconds if cand_seconds else float("inf"))
+
+        if reference != result:
+            failures += 1
+            minimized = minimize(candidate, state)
+            path = os.path.join(SAVE_DIR, f"fuzz_seed{args.seed}_case{case}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(minimized, indent=2))
+            print(f"case {case}: mismatch, minimized input saved to {path}")
+            if failures >= args.max_failures:
+                break
+
+    if not ratios:
+        print("0 cases")
+        return 0
+    ratios.sort()
+    print(f"{len(ratios)} cases, {failures} mismatches, {errors} where the reference raised")
+    print(f"reference {reference_time * 1000:.1f} ms, candidate {candidate_time * 1000:.1f} ms, "
+          f"overall speedup {reference_time / candidate_time:.2f}x, median per case {ratios[len(ratios) // 2]:.2f}x")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
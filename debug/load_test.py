@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "load_results")
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+#(name, method, path, expected status, expected mimetype or None) hit in order by every simulated supervisor,
+#login redirects whether or not the password was right so the session is checked once up front instead
+ROUTES = [
+    ("login", "POST", "/login", 302, None),
+    ("shifts", "GET", "/shifts", 200, "text/html"),
+    ("importance", "GET", "/importance", 200, "text/html"),
+    ("rotation_cycle", "GET", "/rotation-cycle", 200, "text/html"),
+    ("generate_schedule", "POST", "/generate_schedule", 200, XLSX_MIMETYPE),
+]
+
+
+class TestClientTarget:
+    #drives the app in process through the Flask test client against a throwaway sqlite file
+    #and archive, both in one temp dir so nothing touches a real database or the repo
+
+    def __init__(self, users):
+        scratch = tempfile.mkdtemp(prefix="load_test_")
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(scratch, "load_test.db")
+        os.environ["ARCHIVE_FOLDER"] = os.path.join(scratch, "archive")
+
+        import app as webapp
+
+        self.webapp = webapp
+        webapp.app.config["TESTING"] = False
+        self.emails = self.seed_users(users)
+
+    def seed_users(self, users):
+        webapp = self.webapp
+        emails = []
+        with webapp.app.app_context():
+            webapp.db.create_all()
+            for i in range(users):
+                email = f"supervisor{i}@loadtest"
+                if not webapp.User.query.filter_by(email=email).first():
+                    user = webapp.User(email=email, password="loadtest")
+                    webapp.db.session.add(user)
+                    webapp.db.session.commit()
+                    webapp.db.session.add(webapp.Preferences(
+                        account=user.id,
+                        schedule_start="11:00",
+                        schedule_end="19:30",
+                        acceptable_lunch_start="13:00",
+                        acceptable_lunch_end="16:00",
+                        rotation_cycle=webapp.ROTATION_CYCLE["data"],
+                        station_importance=webapp.STATION_IMPORTANCE_DESCENDING["data"],
+                        shifts=webapp.SHIFTS["data"],
+                    ))
+                    webapp.db.session.commit()
+                emails.append(email)
+        return emails
+
+    def session(self):
+        return self.webapp.app.test_client()
+
+    def request(self, session, method, path, data=None):
+        #(status, redirect location, mimetype)
+        response = session.open(path, method=method, data=data)
+        return response.status_code, response.headers.get("Location", ""), response.mimetype
+
+
+class ServerTarget:
+    #drives an already running local server, the accounts must exist there
+
+    def __init__(self, base_url, emails, password):
+        import requests
+
+        self.requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.emails = emails
+        self.password = password
+
+    def session(self):
+        return self.requests.Session()
+
+    def request(self, session, method, path, data=None):
+        #(status, redirect location, mimetype)
+        response = session.request(method, self.base_url + path, data=data, allow_redirects=False)
+        mimetype = response.headers.get("Content-Type", "").split(";")[0].strip()
+        return response.status_code, response.headers.get("Location", ""), mimetype
+
+
+def is_expected(response, status, mimetype) -> bool:
+    code, location, got_mimetype = response
+    #a lost session shows up as a redirect to the login page, never a success
+    if "/login" in location:
+        return False
+    return code == status and (mimetype is None or got_mimetype == mimetype)
+
+
+def check_login(target, email, password) -> bool:
+    #a wrong password still redirects, only an authenticated page proves the login worked
+    session = target.session()
+    target.request(session, "POST", "/login", {"email": email, "password": password})
+    return is_expected(target.request(session, "GET", "/shifts"), 200, "text/html")
+
+
+def run_supervisor(target, email, password, iterations):
+    samples = []
+    session = target.session()
+    for _ in range(iterations):
+        for name, method, path, status, mimetype in ROUTES:
+            data = {"email": email, "password": password} if name == "login" else None
+            began = time.perf_counter()
+            try:
+                ok = is_expected(target.request(session, method, path, data), status, mimetype)
+            except Exception:
+                ok = False
+            samples.append((name, time.perf_counter() - began, ok))
+    return samples
+
+
+def summarize(samples, elapsed):
+    summary = {}
+    for name, *_ in ROUTES:
+        latencies = np.array([s[1] for s in samples if s[0] == name]) * 1000
+        errors = sum(1 for s in samples if s[0] == name and not s[2])
+        if not len(latencies):
+            continue
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary[name] = {
+            "requests": int(len(latencies)),
+            "errors": errors,
+            "error_rate": errors / len(latencies),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+        }
+    return summary
+
+
+def run(target, password, concurrency, iterations):
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(run_supervisor, target, target.emails[i % len(target.emails)], password, iterations)
+            for i in range(concurrency)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    elapsed = time.perf_counter() - began
+    return summarize(samples, elapsed), elapsed
+
+
+def print_summary(summary, baseline=None):
+    print(f"{'route':<20}{'reqs':>7}{'err %':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for name, row in summary.items():
+        line = (f"{name:<20}{row['requests']:>7}{row['error_rate'] * 100:>8.1f}"
+                f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['throughput_rps']:>9.1f}")
+        if baseline and name in baseline:
+            line += f"   p95 {row['p95_ms'] - baseline[name]['p95_ms']:+.1f} ms vs baseline"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test of the scheduler routes.")
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated supervisors running at once")
+    parser.add_argument("--iterations", type=int, default=5, help="route passes per supervisor")
+    parser.add_argument("--users", type=int, default=8, help="distinct accounts to seed for the test client")
+    parser.add_argument("--url", help="base url of a running server instead of the in process test client")
+    parser.add_argument("--email", action="append", help="account to log in with against --url (repeatable)")
+    parser.add_argument("--password", default="loadtest")
+    parser.add_argument("--label", default=datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S"),
+                        help="name of the saved results file")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        if not args.email:
+            parser.error("--url needs at least one --email")
+        target = ServerTarget(args.url, args.email, args.password)
+    else:
+        target = TestClientTarget(args.users)
+
+    failed = [email for email in target.emails if not check_login(target, email, args.password)]
+    if failed:
+        print(f"login failed for {', '.join(failed)}, not running the load test")
+        return 1
+
+    summary, elapsed = run(target, args.password, args.concurrency, args.iterations)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["routes"]
+    print_summary(summary, baseline)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{args.label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "label": args.label,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "target": args.url or "test_client",
+            "elapsed_s": round(elapsed, 3),
+            "routes": summary,
+        }, f, indent=2)
+    print(f"saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
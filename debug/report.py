@@ -2,6 +2,8 @@ from datetime import datetime, timezone
 import json
 from typing import Any, Dict, Optional
 
+from .schedule_diff import ScheduleDiff
+
 class Report:
     def __init__(self, bug_report: Optional[Any]):
         bug_description = bug_report.bug_description
@@ -13,6 +15,7 @@ class Report:
         self.account_id: int = int(account_id)
         self.account_state: Optional[Dict[str, Any]] = None
         self.bug_id = bug_id_number
+        self.schedule_diff = None
 
     def fetch_account_state(self,
                             db: Optional[Any] = None,
@@ -74,6 +77,10 @@ class Report:
 
         raise ValueError("fetch_account_state requires either a callable db or both (db, user_model).")
 
+    def compare_schedules(self, old_snapshot: Dict[str, Any], new_snapshot: Dict[str, Any]):
+        self.schedule_diff = ScheduleDiff(old_snapshot, new_snapshot)
+        return self.schedule_diff
+
     def to_log_lines(self) -> list:
         timestamp = self.timestamp.isoformat(timespec='seconds')
         header = f"[{timestamp}] BUG REPORT (account_id={self.account_id}, bug_id={self.bug_id})"
@@ -81,4 +88,6 @@ class Report:
         
         account_json = json.dumps(self.account_state or {}, ensure_ascii=False)
         account_line = f"Account state: {account_json}"
-        return [header, desc, account_line]
+
+        diff_lines = self.schedule_diff.to_log_lines() if self.schedule_diff is not None else []
+        return [header, desc] + diff_lines + [account_line]
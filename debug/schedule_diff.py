@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from backend.scheduler import Scheduler
+from backend.utils import minutes_to_time, time_to_minutes, rotation_anomalies
+
+
+def snapshot(scheduler: Scheduler) -> dict:
+    #scheduler.schedule columns are in reversed importance order, snapshots keep rotation order
+    importance_index = {name: i for i, name in enumerate(scheduler.station_importance_descending[::-1])}
+    columns = [importance_index[station] for station in scheduler.rotation_cycle]
+    schedule = [[row[c] for c in columns] for row in scheduler.schedule]
+
+    lunches = {}
+    for guard in scheduler.guards:
+        if guard.lunch_break:
+            lunches[guard.name] = minutes_to_time(guard.lunch_break_start)
+
+    return {
+        "start": minutes_to_time(scheduler.start),
+        "stations": list(scheduler.rotation_cycle),
+        "guards": [guard.name for guard in scheduler.guards],
+        "schedule": schedule,
+        "lunches": lunches,
+    }
+
+
+def load_snapshot(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "schedule" in data:
+        return data
+
+    #account state saved by the Logger, regenerate the schedule it would have produced
+    scheduler = Scheduler.from_state(data)
+    scheduler.schedule_lunches()
+    scheduler.create_base_schedule()
+    return snapshot(scheduler)
+
+
+class ScheduleDiff:
+
+    def __init__(self, old: dict, new: dict):
+        self.old = old
+        self.new = new
+
+        self.stations = list(old["stations"]) + [s for s in new["stations"] if s not in old["stations"]]
+        self.guards = list(old["guards"]) + [g for g in new["guards"] if g not in old["guards"]]
+
+        old_start = time_to_minutes(old["start"])
+        new_start = time_to_minutes(new["start"])
+        self.start = min(old_start, new_start)
+        ticks = max(old_start + 15 * len(old["schedule"]), new_start + 15 * len(new["schedule"]))
+        self.ticks = (ticks - self.start) // 15
+
+        self.old_matrix = self._align(old, old_start)
+        self.new_matrix = self._align(new, new_start)
+
+        self.compare()
+
+    def _align(self, snap: dict, start: int) -> np.ndarray:
+        #reindex onto the shared tick grid, station list and guard ids (0 based, -1 unstaffed)
+        matrix = np.full((self.ticks, len(self.stations)), -1)
+        raw = np.asarray(snap["schedule"], dtype=int).reshape(len(snap["schedule"]), len(snap["stations"]))
+
+        guard_ids = np.array([-1] + [self.guards.index(g) for g in snap["guards"]])
+        station_ids = [self.stations.index(s) for s in snap["stations"]]
+        offset = (start - self.start) // 15
+
+        matrix[offset:offset + raw.shape[0], station_ids] = guard_ids[np.where(raw == -1, 0, raw)]
+        return matrix
+
+    def compare(self):
+        old, new = self.old_matrix, self.new_matrix
+
+        changed = old != new
+        self.changed_cells = [
+            (self._time(t), self.stations[s], self._guard(old[t, s]), self._guard(new[t, s]))
+            for t, s in zip(*np.nonzero(changed))
+        ]
+
+        old_position = self._positions(old)
+        new_position = self._positions(new)
+        moved = (old_position != new_position) & (old_position != -1) & (new_position != -1)
+        self.moved_guards = [
+            (self._time(t), self.guards[g], self.stations[old_position[t, g]], self.stations[new_position[t, g]])
+            for t, g in zip(*np.nonzero(moved))
+        ]
+
+        old_lunches = self.old.get("lunches", {})
+        new_lunches = self.new.get("lunches", {})
+        self.lunch_shifts = [
+            (guard, old_lunches.get(guard), new_lunches.get(guard))
+            for guard in self.guards
+            if old_lunches.get(guard) != new_lunches.get(guard)
+        ]
+
+        old_anomalies = rotation_anomalies(old)
+        new_anomalies = rotation_anomalies(new)
+        self.old_anomaly_count = int(old_anomalies.sum())
+        self.new_anomaly_count = int(new_anomalies.sum())
+        self.added_anomalies = [
+            (self._time(t), self.stations[s]) for t, s in zip(*np.nonzero(new_anomalies & ~old_anomalies))
+        ]
+        self.resolved_anomalies = [
+            (self._time(t), self.stations[s]) for t, s in zip(*np.nonzero(old_anomalies & ~new_anomalies))
+        ]
+
+    def _positions(self, matrix: np.ndarray) -> np.ndarray:
+        position = np.full((self.ticks, len(self.guards)), -1)
+        rows, cols = np.nonzero(matrix != -1)
+        position[rows, matrix[rows, cols]] = cols
+        return position
+
+    def _time(self, tick) -> str:
+        return minutes_to_time(self.start + 15 * int(tick))
+
+    def _guard(self, guard_id):
+        return None if guard_id == -1 else self.guards[guard_id]
+
+    def is_identical(self) -> bool:
+        return not (self.changed_cells or self.lunch_shifts)
+
+    def to_dict(self) -> dict:
+        return {
+            "changed_cells": self.changed_cells,
+            "moved_guards": self.moved_guards,
+            "lunch_shifts": self.lunch_shifts,
+            "anomalies": {
+                "old": self.old_anomaly_count,
+                "new": self.new_anomaly_count,
+                "added": self.added_anomalies,
+                "resolved": self.resolved_anomalies,
+            },
+        }
+
+    def to_log_lines(self) -> list:
+        if self.is_identical():
+            return ["Schedule diff: identical"]
+
+        lines = [
+            f"Schedule diff: {len(self.changed_cells)} changed cells, "
+            f"{len(self.moved_guards)} moved guards, {len(self.lunch_shifts)} lunch shifts, "
+            f"anomalies {self.old_anomaly_count} -> {self.new_anomaly_count}"
+        ]
+        for time, guard, old_station, new_station in self.moved_guards:
+            lines.append(f"  {time} {guard}: {old_station} -> {new_station}")
+        for guard, old_lunch, new_lunch in self.lunch_shifts:
+            lines.append(f"  lunch {guard}: {old_lunch} -> {new_lunch}")
+        return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a baseline schedule against one or more others.")
+    parser.add_argument("baseline", help="schedule snapshot or json state save")
+    parser.add_argument("others", nargs="+", help="schedule snapshots, json state saves or directories of them")
+    parser.add_argument("--json", action="store_true", help="print the full diff as json")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for path in args.others:
+        if os.path.isdir(path):
+            paths.extend(sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".json")))
+        else:
+            paths.append(path)
+
+    baseline = load_snapshot(args.baseline)
+    different = 0
+    for path in paths:
+        diff = ScheduleDiff(baseline, load_snapshot(path))
+        if not diff.is_identical():
+            different += 1
+        if args.json:
+            print(json.dumps({"file": path, **diff.to_dict()}))
+        else:
+            print(path)
+            for line in diff.to_log_lines():
+                print(line)
+
+    return 1 if different else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())